@@ -1,15 +1,22 @@
+from __future__ import annotations
+
 from datetime import date
-from pathlib import Path
+from typing import TYPE_CHECKING
 
-from pyseasonal.products.seas2ipe import swen_seas2ipe
 from pyseasonal.utils.config import load_config_argo
 
+if TYPE_CHECKING:
+    from pathlib import Path
+
 
 def main_ipe(
     config_file: str | Path,
     year: int = date.today().year,
     month: int = date.today().month,
 ):
+    # imported here so that importing this module does not pull in the xarray/numpy stack
+    from pyseasonal.products.seas2ipe import swen_seas2ipe
+
     config = load_config_argo(config_file)
 
     swen_seas2ipe(config, str(year), f"{month:02d}",)
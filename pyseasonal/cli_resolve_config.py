@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from pyseasonal.utils.config import resolve_config
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def main_resolve_config(
+    config_file: str | Path,
+    output_file: str | Path,
+    gcm_store: str = 'argo',
+    data_dir: str | None = None,
+) -> None:
+    """
+    CLI entry point to resolve the paths of a configuration file ahead of time.
+
+    Joins the relative paths of <gcm_store> with the data directory once and
+    writes the result to a new YAML file, which the loaders then read without
+    rebuilding the paths, e.g. as an image build step for argo deployments.
+
+    Parameters:
+    -----------
+    config_file : str or Path
+        Path to the source YAML configuration file
+    output_file : str or Path
+        Path of the resolved YAML configuration file to be written
+    gcm_store : str, optional
+        Path block to resolve (default: 'argo')
+    data_dir : str, optional
+        Base directory of the relative paths (default: DATA_DIR environment variable);
+        resolving argo paths fails if neither is set
+    """
+    resolve_config(config_file, output_file, gcm_store, data_dir)
+
+
+if __name__ == "__main__":
+    import fire
+
+    fire.Fire(main_resolve_config)
@@ -1,14 +1,19 @@
+from __future__ import annotations
+
 from datetime import date
-from pathlib import Path
+from typing import TYPE_CHECKING
 
-from pyseasonal.pred2tercile_operational import swen_pred2tercile_operational
 from pyseasonal.utils.config import load_config
 
+if TYPE_CHECKING:
+    from pathlib import Path
+
 
 def main_pred2tercile(
     config_file: str | Path,
     year: int = date.today().year,
     month: int = date.today().month,
+    asof: str | None = None,
 ) -> None:
     """
     CLI entry point for operational tercile prediction processing.
@@ -24,10 +29,22 @@ def main_pred2tercile(
         Forecast year (default: current year)
     month : int, optional
         Forecast month (default: current month)
+    asof : str, optional
+        Forecast year and month as 'YYYY-MM', overriding <year> and <month>
     """
+    if asof is None:
+        year, month = str(year), f"{month:02d}"
+    else:
+        year, _, month = asof.partition('-')
+        if not (len(year) == 4 and len(month) == 2 and (year + month).isdigit() and 1 <= int(month) <= 12):
+            raise ValueError('<asof> must be given as YYYY-MM !')
+
+    # imported here so that importing this module does not pull in the xarray/numpy stack
+    from pyseasonal.pred2tercile_operational import swen_pred2tercile_operational
+
     config = load_config(config_file)
 
-    swen_pred2tercile_operational(config, str(year), f"{month:02d}")
+    swen_pred2tercile_operational(config, year, month)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from pyseasonal.utils.config import yaml2json
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def main_yaml2json(
+    config_file: str | Path,
+    output_file: str | Path | None = None,
+) -> None:
+    """
+    CLI entry point to convert a YAML configuration file to JSON.
+
+    By default the JSON file is written next to the YAML file, where the
+    configuration loaders pick it up instead of parsing the YAML file, as
+    long as the JSON file is not older than the YAML file.
+
+    Parameters:
+    -----------
+    config_file : str or Path
+        Path to the YAML configuration file
+    output_file : str or Path, optional
+        Path of the JSON file to be written (default: <config_file> with .json suffix)
+    """
+    yaml2json(str(config_file), output_file)
+
+
+if __name__ == "__main__":
+    import fire
+
+    fire.Fire(main_yaml2json)
@@ -1,45 +1,295 @@
+import copy
+import functools
+import json
+import logging
 import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 
 import yaml
 
+try:
+    from yaml import CSafeLoader as SafeLoader  # libyaml-backed parser
+except ImportError:
+    from yaml import SafeLoader
 
-def load_config(config_path):
-    """Load configuration from YAML file"""
-    print('The path of the configuration file is '+str(config_path))
-    with open(config_path, 'r') as file:
-        config = yaml.safe_load(file)
+logger = logging.getLogger(__name__)
 
-    # Setup paths based on GCM_STORE environment variable
-    gcm_store = os.getenv('GCM_STORE', 'lustre')
-    if gcm_store in config['paths']:
-        paths = config['paths'][gcm_store]
-        config['paths'] = paths
-    else:
-        raise ValueError('Unknown entry for <gcm_store> !')
+# Paths of the argo store given relative to the DATA_DIR environment variable
+_DATA_DIR_KEYS = ('path_gcm_base', 'path_gcm_base_derived', 'path_gcm_base_masked', 'dir_forecast')
+
+# Whether os.stat() can look up names relative to a directory opened with O_PATH (Linux)
+_STAT_DIR_FD = os.stat in os.supports_dir_fd and hasattr(os, 'O_PATH')
+
+# Stores on network file systems, whose paths are checked concurrently
+_REMOTE_STORES = ('lustre',)
+
+# Entries of <paths> holding bare file names rather than paths, e.g. <filename_telcon>
+_FILENAME_TOKEN = 'filename'
 
+
+def _validate_config(config):
+    """Check the structure of a parsed configuration file, raising ValueError on failure"""
+    if not isinstance(config, dict):
+        raise ValueError('The configuration file must define a mapping of parameters !')
+    if not isinstance(config.get('paths'), dict):
+        raise ValueError('The configuration file must define a <paths> mapping !')
+    for gcm_store, paths in config['paths'].items():
+        if not isinstance(paths, dict) or not all(isinstance(path, str) for path in paths.values()):
+            raise ValueError('<paths> entry for <'+str(gcm_store)+'> must map path names to strings !')
+    if 'argo' in config['paths']:
+        missing = [key for key in _DATA_DIR_KEYS if key not in config['paths']['argo']]
+        if missing:
+            raise ValueError('<paths> entry for <argo> lacks '+', '.join(missing)+' !')
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_config(content, is_json=False):
+    """Parse and validate raw YAML or JSON bytes; cached on the content, shared by identical files"""
+    config = json.loads(content) if is_json else yaml.load(content, Loader=SafeLoader)
+    _validate_config(config)
     return config
 
 
-def load_config_argo(config_path):
-    """Load configuration from YAML file"""
-    print('The path of the configuration file is '+str(config_path))
-    with open(config_path, 'r') as file:
-        config = yaml.safe_load(file)
+@functools.lru_cache(maxsize=32)
+def _load_config_cached(config_path, mtime_ns):
+    """Parse a YAML or JSON file; cached on its absolute path and modification time"""
+    with open(config_path, 'rb') as file:
+        return _parse_config(file.read(), config_path.endswith('.json'))
 
-    # Setup paths based on GCM_STORE environment variable
-    gcm_store = os.getenv('GCM_STORE', 'lustre')
-    if gcm_store in config['paths']:
-        paths = config['paths'][gcm_store]
-        # Handle special cases for argo environment
-        if gcm_store == 'argo':
-            data_dir = os.getenv("DATA_DIR", "")
-            paths['home'] = data_dir
-            paths['path_gcm_base'] = data_dir + paths['path_gcm_base']
-            paths['path_gcm_base_derived'] = data_dir + paths['path_gcm_base_derived']
-            paths['path_gcm_base_masked'] = data_dir + paths['path_gcm_base_masked']
-            paths['dir_forecast'] = data_dir + paths['dir_forecast']
-        config['paths'] = paths
+
+def _read_config(config_path):
+    """Return a private copy of the parsed configuration file, reparsed only if it changed on disk
+
+    <config_path> may also be an open text or binary stream of YAML content, which is read
+    without touching the file system. A JSON sibling of a YAML file (same name, .json suffix,
+    see yaml2json()) is read instead of the YAML file as long as it is newer than the latter.
+    """
+    if hasattr(config_path, 'read'):
+        return copy.deepcopy(_parse_config(config_path.read()))
+    config_path = os.path.abspath(config_path)
+    mtime_ns = os.stat(config_path).st_mtime_ns
+    json_path = os.path.splitext(config_path)[0] + '.json'
+    if json_path != config_path:
+        try:
+            json_mtime_ns = os.stat(json_path).st_mtime_ns
+        except FileNotFoundError:
+            json_mtime_ns = None
+        # on a tie, e.g. with coarse timestamps, the YAML file may have been edited after the conversion
+        if json_mtime_ns is not None and json_mtime_ns > mtime_ns:
+            config_path, mtime_ns = json_path, json_mtime_ns
+    config = _load_config_cached(config_path, mtime_ns)
+    # callers modify the returned dictionary in place, so never hand out the cached object
+    return copy.deepcopy(config)
+
+
+def _build_paths(paths_dict, data_dir=None):
+    """Return a copy of the argo path block with its relative entries prefixed with <data_dir>,
+    DATA_DIR or <home>, whichever is set first; <paths_dict> itself is left untouched"""
+    data_dir = data_dir or os.environ.get("DATA_DIR") or paths_dict.get('home', '')
+    paths = dict(paths_dict, home=data_dir)
+    for key in _DATA_DIR_KEYS:
+        # without a base directory, absolute entries stay absolute
+        path = paths_dict[key].lstrip(os.sep) if data_dir else paths_dict[key]
+        paths[key] = os.path.normpath(os.path.join(data_dir, path))
+    return paths
+
+
+def _stat_path(path, dir_fd=None):
+    """Return os.stat() of <path>, or None if it does not exist; looked up by name in <dir_fd> if given
+
+    Other errors, e.g. PermissionError or a symlink loop, are raised unchanged.
+    """
+    try:
+        if dir_fd is None:
+            return os.stat(path)
+        name = os.path.basename(os.path.normpath(path))
+        if not name:
+            return os.stat(path)
+        # keep a trailing separator, which requires the entry to be a directory as in the full path lookup
+        if path.endswith(os.sep) or (os.altsep and path.endswith(os.altsep)):
+            name += os.sep
+        return os.stat(name, dir_fd=dir_fd)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
+def _stat_group(parent, entries):
+    """Stat the (key, path) pairs of <entries>, all located in the directory <parent> and sorted by path
+
+    Returns (key, path, stat) triples up to and including the first missing entry, whose stat is None.
+    Where supported, siblings are looked up relative to one open descriptor of <parent>,
+    so that the parent path is resolved only once instead of once per entry.
+    """
+    dir_fd = None
+    if _STAT_DIR_FD and len(entries) > 1:
+        try:
+            dir_fd = os.open(parent or os.curdir, os.O_PATH | os.O_DIRECTORY)
+        except OSError:
+            # the parent itself is missing or no directory, let the first entry report it
+            pass
+    try:
+        results = []
+        for key, path in entries:
+            stat = _stat_path(path, dir_fd)
+            results.append((key, path, stat))
+            if stat is None:
+                break
+        return results
+    finally:
+        if dir_fd is not None:
+            os.close(dir_fd)
+
+
+@functools.lru_cache(maxsize=1)
+def _executor(pid):
+    """Thread pool probing the path groups, shared by all calls of one process (<pid>)
+
+    Keyed on the process id, since the threads of a pool do not survive a fork.
+    """
+    return ThreadPoolExecutor(max_workers=16, thread_name_prefix='check_paths')
+
+
+def _check_paths_exist(paths_dict, concurrent=False):
+    """Raise FileNotFoundError for the first path of <paths_dict>, in sorted order, that does not exist
+
+    Empty entries and file names (keys containing 'filename') are not checked. The paths
+    are grouped by parent directory; with <concurrent>, the groups are probed in a thread
+    pool, which only pays off where each lookup is a network round trip, as on lustre.
+    Returns the os.stat() results of the checked paths by key, so that callers can reuse
+    them without another lookup.
+    """
+    groups = {}
+    for key, path in sorted(paths_dict.items(), key=lambda item: item[1]):
+        if not path or _FILENAME_TOKEN in key:
+            continue
+        groups.setdefault(os.path.dirname(os.path.normpath(path)), []).append((key, path))
+    if not groups:
+        return {}
+
+    # probe paths and parents in lexicographic order so that neighbouring directories are looked up together
+    parents = sorted(groups)
+    entries = [groups[parent] for parent in parents]
+    if concurrent and len(parents) > 1:
+        results = _executor(os.getpid()).map(_stat_group, parents, entries)
     else:
+        results = map(_stat_group, parents, entries)
+    stats, missing = {}, []
+    for group in results:
+        for key, path, stat in group:
+            if stat is None:
+                missing.append((path, key))
+            else:
+                stats[key] = stat
+    if missing:
+        # each group stops at its first missing path, report the first of these across the groups
+        path, key = min(missing)
+        raise FileNotFoundError("Path for '"+key+"' does not exist: "+path)
+    return stats
+
+
+def _select_paths(config, gcm_store, build_argo_paths, data_dir=None):
+    """Return the path block of <gcm_store>, with the argo paths built if requested"""
+    if gcm_store not in config['paths']:
         raise ValueError('Unknown entry for <gcm_store> !')
+    paths = config['paths'][gcm_store]
+    # Handle special cases for argo environment
+    if build_argo_paths and gcm_store == 'argo' and not config.get('_is_resolved'):
+        paths = _build_paths(paths, data_dir)
+    return paths
+
+
+def _setup_paths(config, check_paths, build_argo_paths):
+    """Replace the <paths> of a parsed <config> in place by the block selected by GCM_STORE"""
+    # Setup paths based on GCM_STORE environment variable
+    gcm_store = os.getenv('GCM_STORE', 'lustre')
+    config['paths'] = _select_paths(config, gcm_store, build_argo_paths)
+
+    if check_paths:
+        _check_paths_exist(config['paths'], concurrent=gcm_store in _REMOTE_STORES)
 
     return config
+
+
+def _load_config(config_path, check_paths, build_argo_paths):
+    """Shared implementation of load_config() and load_config_argo()"""
+    logger.debug('The path of the configuration file is %s', config_path)
+    return _setup_paths(_read_config(config_path), check_paths, build_argo_paths)
+
+
+def load_config_dict(config, check_paths=False, build_argo_paths=False):
+    """Like load_config(), but for an already parsed configuration dictionary, which is left untouched"""
+    _validate_config(config)
+    return _setup_paths(copy.deepcopy(config), check_paths, build_argo_paths)
+
+
+def load_config(config_path, check_paths=False):
+    """Load configuration from YAML file or stream; with <check_paths>, fail early on missing paths"""
+    return _load_config(config_path, check_paths, build_argo_paths=False)
+
+
+def load_config_argo(config_path, check_paths=False):
+    """Like load_config(), but prefixing the relative argo paths with DATA_DIR"""
+    return _load_config(config_path, check_paths, build_argo_paths=True)
+
+
+def _umask():
+    """Return the file mode creation mask of the process, which can only be read by setting it"""
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+
+def _write_atomic(output_path, text):
+    """Write <text> UTF-8 encoded to <output_path> through a temporary file, never leaving it half-written"""
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    fd, tmp_path = tempfile.mkstemp(dir=output_dir, prefix='.' + os.path.basename(output_path) + '.')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            file.write(text)
+        # mkstemp() creates the file readable by its owner only, give it the mode of a plain open() instead
+        os.chmod(tmp_path, 0o666 & ~_umask())
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def resolve_config(config_path, output_path, gcm_store='argo', data_dir=None):
+    """Write the configuration with the final paths of <gcm_store> to <output_path>
+
+    The written file only contains the <gcm_store> path block and is flagged with
+    <_is_resolved>, so that load_config_argo() uses its paths as they are. Raises
+    ValueError if the argo paths have no base directory, i.e. neither <data_dir>,
+    DATA_DIR nor <home> is set, since they would stay relative for good.
+    """
+    config = _read_config(config_path)
+    paths = _select_paths(config, gcm_store, True, data_dir)
+    if gcm_store == 'argo' and not paths.get('home'):
+        raise ValueError('No base directory for the <argo> paths, set <data_dir> or DATA_DIR !')
+    config['paths'] = {gcm_store: paths}
+    config['_is_resolved'] = True
+
+    _write_atomic(output_path, yaml.safe_dump(config, sort_keys=False, allow_unicode=True))
+
+
+def yaml2json(config_path, output_path=None):
+    """Convert a YAML configuration file to JSON, by default written next to it with a .json suffix
+
+    The loaders pick up this sibling instead of the YAML file, skipping the YAML parser.
+    Raises ValueError, leaving <output_path> untouched, if JSON cannot represent the configuration.
+    """
+    config_path = os.fspath(config_path)
+    if output_path is None:
+        output_path = os.path.splitext(config_path)[0] + '.json'
+    with open(config_path, 'rb') as file:
+        config = _parse_config(file.read())
+    try:
+        text = json.dumps(config, ensure_ascii=False)
+    except TypeError as err:
+        raise ValueError('The configuration file cannot be converted to JSON: '+str(err)+' !') from None
+    # JSON silently turns e.g. integer keys into strings, the sibling must load to the same configuration
+    if json.loads(text) != config:
+        raise ValueError('The configuration file changes when converted to JSON !')
+    _write_atomic(output_path, text)
+    return output_path
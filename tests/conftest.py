@@ -0,0 +1,63 @@
+"""Fixtures shared by the pySeasonal test suite."""
+
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+
+import pytest
+import yaml
+
+
+SHARED_DIR_NAMES = ['home', 'gcm_base', 'gcm_derived', 'gcm_masked', 'rundir', 'quantile', 'forecast', 'masks',
+                    'valid', 'exists', 'test_data']
+
+
+def _filesystem_type(path):
+    """Return the type of the file system holding <path> according to /proc/mounts."""
+    path = os.path.realpath(path)
+    best_mount, best_type = '', None
+    with open('/proc/mounts') as mounts:
+        for line in mounts:
+            mount_point, fs_type = line.split()[1:3]
+            if (path == mount_point or path.startswith(mount_point.rstrip('/') + '/')) \
+                    and len(mount_point) > len(best_mount):
+                best_mount, best_type = mount_point, fs_type
+    return best_type
+
+
+def pytest_configure(config):
+    """With FAST_TESTS=1, require the libyaml-backed YAML parser and the temporary directory on tmpfs."""
+    if os.environ.get('FAST_TESTS') != '1':
+        return
+    if not yaml.__with_libyaml__:
+        raise pytest.UsageError('FAST_TESTS=1 expects PyYAML built with libyaml, reinstall it with '
+                                '"pip install --force-reinstall --no-binary pyyaml pyyaml"')
+    if not sys.platform.startswith('linux'):
+        return
+    tmpdir = tempfile.gettempdir()
+    fs_type = _filesystem_type(tmpdir)
+    if fs_type != 'tmpfs':
+        raise pytest.UsageError('FAST_TESTS=1 expects the temporary directory on tmpfs, but '
+                                + tmpdir + ' is on ' + str(fs_type) + '; set e.g. TMPDIR=/dev/shm')
+
+
+def _bulk_mkdir(paths):
+    """Create all directories of <paths>, including missing parents, in one pass."""
+    for path in paths:
+        os.makedirs(path, exist_ok=True)
+
+
+@pytest.fixture(scope='session')
+def shared_dirs(tmp_path_factory):
+    """Directory skeleton built once per session; tests must only read from it.
+
+    Returns a namespace with the resolved <root> directory, one attribute per entry of
+    SHARED_DIR_NAMES and <file>, a small regular file next to the directories.
+    """
+    root = tmp_path_factory.mktemp('shared_dirs', numbered=False).resolve()
+    dirs = {name: root / name for name in SHARED_DIR_NAMES}
+    _bulk_mkdir(dirs.values())
+    dirs['file'] = root / 'file.txt'
+    dirs['file'].write_text('test content')
+    return SimpleNamespace(root=root, **dirs)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+
+"""
+Test suite for the main_pred2tercile() command line entry point.
+
+Tests cover:
+- Forwarding of <year> and <month> as zero-padded strings
+- Parsing of the <asof> option given as YYYY-MM
+- Rejection of malformed <asof> values
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add parent directory to path to import pyseasonal
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyseasonal import cli_tercile
+
+
+@pytest.fixture
+def operational_calls(monkeypatch):
+    """Replace the configuration loader and the operational run, recording the (year, month) of each run."""
+    calls = []
+    monkeypatch.setattr(cli_tercile, 'load_config', lambda config_file: {'config_file': config_file})
+    monkeypatch.setitem(sys.modules, 'pyseasonal.pred2tercile_operational', SimpleNamespace(
+        swen_pred2tercile_operational=lambda config, year, month: calls.append((year, month))))
+    return calls
+
+
+class TestMainPred2tercile:
+    """Test cases for main_pred2tercile()."""
+
+    def test_year_and_month(self, operational_calls):
+        """Test that <year> and <month> are passed on as strings, the month zero-padded."""
+        cli_tercile.main_pred2tercile('config.yaml', year=2024, month=3)
+        assert operational_calls == [('2024', '03')]
+
+    @pytest.mark.parametrize('asof, expected', [
+        ('2024-01', ('2024', '01')),
+        ('2024-12', ('2024', '12')),
+        ('1993-07', ('1993', '07')),
+    ])
+    def test_valid_asof(self, operational_calls, asof, expected):
+        """Test that <asof> overrides <year> and <month>."""
+        cli_tercile.main_pred2tercile('config.yaml', year=2000, month=1, asof=asof)
+        assert operational_calls == [expected]
+
+    @pytest.mark.parametrize('asof', ['2024-13', '2024-00', '2024-1', '24-01', '2024/01', '2024-ab', '202401', ''])
+    def test_invalid_asof(self, operational_calls, asof):
+        """Test that malformed <asof> values are rejected before any processing."""
+        with pytest.raises(ValueError, match='<asof> must be given as YYYY-MM'):
+            cli_tercile.main_pred2tercile('config.yaml', asof=asof)
+        assert operational_calls == []
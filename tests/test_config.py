@@ -0,0 +1,674 @@
+#!/usr/bin/env python
+
+"""
+Test suite for the configuration loaders in pyseasonal.utils.config.
+
+Tests cover:
+- Selection of the path block given by the GCM_STORE environment variable
+- Prefixing of the argo paths with the DATA_DIR environment variable
+- Caching of the parsed YAML files and invalidation on file changes
+- Existence checks of the selected paths
+- Resolution of the paths ahead of time with resolve_config()
+- Use of up-to-date JSON siblings written by yaml2json()
+- Validation of the structure of the configuration files
+- Error handling for unknown stores and missing files
+"""
+
+import copy
+import errno
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import stat
+import string
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+import yaml
+
+# Add parent directory to path to import pyseasonal
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyseasonal.utils import config as config_module
+from pyseasonal.utils.config import (_build_paths, _check_paths_exist, load_config, load_config_argo, load_config_dict,
+                                     resolve_config, yaml2json)
+
+
+CONFIG_CONTENT = """
+models: ['ecmwf']
+version: ['51']
+domain: 'Iberia'
+
+paths:
+  lustre:
+    home: '/lustre/gmeteo/PTICLIMA'
+    path_gcm_base: '/lustre/gmeteo/PTICLIMA/DATA/SEASONAL'
+    path_gcm_base_derived: '/lustre/gmeteo/PTICLIMA/DATA/SEASONAL_derived'
+    path_gcm_base_masked: '/lustre/gmeteo/PTICLIMA/DATA/SEASONAL_masked'
+    dir_forecast: '/lustre/gmeteo/PTICLIMA/Results/seasonal/forecast'
+    mask_dir: '/lustre/gmeteo/PTICLIMA/Auxiliary-material/Masks'
+
+  argo:
+    home: ''
+    path_gcm_base: 'seasonal-original-single-levels'
+    path_gcm_base_derived: 'seasonal-original-single-levels_derived'
+    path_gcm_base_masked: 'seasonal-original-single-levels_masked'
+    dir_forecast: 'seasonal-original-single-levels_derived/forecast'
+    mask_dir: '/Auxiliary-material/Masks'
+"""
+
+# Parsed once, for the tests of the logic applied after parsing
+CONFIG_DICT = yaml.safe_load(CONFIG_CONTENT)
+
+
+# Realistic pred2tercile-like configuration; tests deep-copy it and fill in the lustre paths
+REALISTIC_CONFIG = {
+    'models': ['ecmwf', 'cmcc'],
+    'version': ['51', '4'],
+    'agg_label': ['1mon', '3mon'],
+    'quantile_threshold': [0.33, 0.67],
+    'paths': {'lustre': {}},
+}
+
+# Lustre path entries of REALISTIC_CONFIG and the shared_dirs directories they point to
+REALISTIC_PATH_DIRS = {
+    'home': 'home', 'path_gcm_base': 'gcm_base', 'path_gcm_base_derived': 'gcm_derived',
+    'path_gcm_base_masked': 'gcm_masked', 'rundir': 'rundir', 'dir_quantile': 'quantile',
+    'dir_forecast': 'forecast', 'mask_dir': 'masks',
+}
+
+ARGO_TEMPLATE = string.Template("""
+paths:
+  argo:
+    home: ''
+    path_gcm_base: 'gcm_base'
+    path_gcm_base_derived: 'gcm_derived'
+    path_gcm_base_masked: 'gcm_masked'
+    dir_forecast: 'forecast'
+    mask_dir: '$masks'
+""")
+
+# Messages of the errors raised by the loaders, compiled once for all tests
+MISSING_PATH_RE = re.compile(r"Path for '(.+)' does not exist")
+UNKNOWN_STORE_RE = re.compile('Unknown entry for <gcm_store>')
+
+
+def _missing_key(excinfo):
+    """Return the key named by a FileNotFoundError of a missing path."""
+    return MISSING_PATH_RE.match(str(excinfo.value)).group(1)
+
+
+def _write_config(path, text):
+    """Write <text> UTF-8 encoded to <path> with a single open/close, repeating short writes."""
+    data = memoryview(text.encode('utf-8'))
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        while data:
+            data = data[os.write(fd, data):]
+    finally:
+        os.close(fd)
+
+
+def _run_with_ascii_locale(function, *args):
+    """Call <function> of pyseasonal.utils.config on <args> in a Python process with an ASCII locale encoding."""
+    code = 'import sys; from pyseasonal.utils import config; config.' + function + '(*sys.argv[1:])'
+    subprocess.run([sys.executable, '-c', code, *map(os.fspath, args)], check=True,
+                   env=dict(os.environ, LC_ALL='C', PYTHONUTF8='0'), cwd=Path(__file__).parent.parent)
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    """Write the test configuration to a temporary YAML file."""
+    path = tmp_path / 'config.yaml'
+    _write_config(path, CONFIG_CONTENT)
+    return path
+
+
+@pytest.fixture(scope='session')
+def yaml_file(tmp_path_factory):
+    """Return a function writing YAML text to a file named after its hash, only once per content.
+
+    Tests must not modify the returned files, since tests with identical content share them.
+    """
+    cache_dir = tmp_path_factory.mktemp('yaml_cache')
+
+    def write(text):
+        path = cache_dir / (hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest() + '.yaml')
+        if not path.exists():
+            _write_config(path, text)
+        return path
+
+    return write
+
+
+@pytest.fixture(scope='class')
+def base_config_file(yaml_file):
+    """Test configuration shared by all test classes; tests must not modify it."""
+    return yaml_file(CONFIG_CONTENT)
+
+
+class TestBuildPaths:
+    """Test cases for _build_paths()."""
+
+    def test_only_data_dir_keys_are_prefixed(self, monkeypatch):
+        """Test that DATA_DIR is prepended to the relative argo paths only."""
+        monkeypatch.setenv('DATA_DIR', '/data/')
+        paths_dict = {'home': '', 'path_gcm_base': 'base', 'path_gcm_base_derived': 'derived',
+                      'path_gcm_base_masked': 'masked', 'dir_forecast': 'forecast',
+                      'rundir': '/app/terciles', 'mask_dir': '/Masks'}
+        result = _build_paths(paths_dict)
+        assert result == {'home': '/data/', 'path_gcm_base': '/data/base',
+                          'path_gcm_base_derived': '/data/derived', 'path_gcm_base_masked': '/data/masked',
+                          'dir_forecast': '/data/forecast', 'rundir': '/app/terciles', 'mask_dir': '/Masks'}
+
+    def test_input_not_modified(self, monkeypatch):
+        """Test that the passed dictionary is left untouched."""
+        monkeypatch.setenv('DATA_DIR', '/data')
+        paths_dict = {'home': '', 'path_gcm_base': 'base', 'path_gcm_base_derived': 'derived',
+                      'path_gcm_base_masked': 'masked', 'dir_forecast': 'forecast'}
+        original = dict(paths_dict)
+        result = _build_paths(paths_dict)
+        assert paths_dict == original
+        assert result is not paths_dict
+
+    @pytest.mark.parametrize('data_dir', ['/data', '/data/', '/data//'])
+    def test_trailing_slash_handling(self, monkeypatch, data_dir):
+        """Test that DATA_DIR and the relative paths are joined with a single separator."""
+        monkeypatch.setenv('DATA_DIR', data_dir)
+        paths_dict = {'home': '', 'path_gcm_base': 'base/', 'path_gcm_base_derived': '/derived',
+                      'path_gcm_base_masked': 'masked', 'dir_forecast': 'medcof/forecast/terciles/'}
+        result = _build_paths(paths_dict)
+        assert result['path_gcm_base'] == '/data/base'
+        assert result['path_gcm_base_derived'] == '/data/derived'
+        assert result['path_gcm_base_masked'] == '/data/masked'
+        assert result['dir_forecast'] == '/data/medcof/forecast/terciles'
+
+    def test_data_dir_not_set(self, monkeypatch):
+        """Test that the relative paths are kept when DATA_DIR is not set."""
+        monkeypatch.delenv('DATA_DIR', raising=False)
+        paths_dict = {'home': '', 'path_gcm_base': 'base', 'path_gcm_base_derived': 'derived',
+                      'path_gcm_base_masked': 'masked', 'dir_forecast': 'forecast'}
+        assert _build_paths(paths_dict) == paths_dict
+
+    def test_absolute_paths_kept_without_base_directory(self, monkeypatch):
+        """Test that absolute entries stay absolute when neither DATA_DIR nor <home> is set."""
+        monkeypatch.delenv('DATA_DIR', raising=False)
+        paths_dict = {'home': '', 'path_gcm_base': '/seasonal', 'path_gcm_base_derived': 'derived',
+                      'path_gcm_base_masked': '/masked/', 'dir_forecast': 'forecast'}
+        result = _build_paths(paths_dict)
+        assert result['path_gcm_base'] == '/seasonal'
+        assert result['path_gcm_base_masked'] == '/masked'
+        assert result['path_gcm_base_derived'] == 'derived'
+
+    def test_home_used_when_data_dir_not_set(self, monkeypatch):
+        """Test that <home> serves as base directory when DATA_DIR is not set."""
+        monkeypatch.delenv('DATA_DIR', raising=False)
+        paths_dict = {'home': '/data', 'path_gcm_base': 'base', 'path_gcm_base_derived': 'derived',
+                      'path_gcm_base_masked': 'masked', 'dir_forecast': 'forecast'}
+        result = _build_paths(paths_dict)
+        assert result['home'] == '/data'
+        assert result['path_gcm_base'] == '/data/base'
+
+
+CHECK_PATHS_CASES = [
+    pytest.param(lambda d: {'path1': os.fspath(d.valid), 'path2': os.fspath(d.exists) + '/', 'path3': os.fspath(d.file),
+                            'home': os.fspath(d.root)},
+                 ['home', 'path1', 'path2', 'path3'], None, id='all_exist'),
+    pytest.param(lambda d: {'home': '', 'filename_telcon': 'oni2enso.nc', 'rundir': os.fspath(d.rundir)},
+                 ['rundir'], None, id='skipped_entries'),
+    pytest.param(lambda d: {'existing_path': os.fspath(d.exists), 'missing_path': os.fspath(d.root / 'missing')},
+                 None, 'missing_path', id='missing_sibling'),
+    pytest.param(lambda d: {'home': os.fspath(d.home), 'missing': os.fspath(d.root / 'a' / 'b')},
+                 None, 'missing', id='missing_single_path'),
+    pytest.param(lambda d: {'missing1': os.fspath(d.root / 'nope' / 'a'), 'missing2': os.fspath(d.root / 'nope' / 'b')},
+                 None, 'missing1', id='missing_parent_directory'),
+    pytest.param(lambda d: {'missing' + str(i): os.fspath(d.root / str(i) / 'missing') for i in range(20)},
+                 None, 'missing0', id='first_of_many_missing'),
+    pytest.param(lambda d: {'first': os.fspath(d.root / 'b' / 'missing'), 'second': os.fspath(d.root / 'a' / 'missing')},
+                 None, 'second', id='sorted_order'),
+    pytest.param(lambda d: {'x': os.fspath(d.root / 'a-b' / 'm'), 'y': os.fspath(d.root / 'a' / 'z')},
+                 None, 'x', id='sorted_order_across_parents'),
+    pytest.param(lambda d: {'nested': os.fspath(d.file / 'nested')},
+                 None, 'nested', id='path_below_file'),
+    pytest.param(lambda d: {'a': os.fspath(d.file) + '/', 'b': os.fspath(d.valid)},
+                 None, 'a', id='file_with_trailing_slash'),
+]
+
+
+# Wall time allowed for _check_paths_exist() in the RUN_PERF=1 gate, relative to a plain os.stat() loop
+# over the same paths; about 2.5 on a local file system
+PERF_BUDGET_FACTOR = 5.0
+
+
+class TestCheckPathsExist:
+    """Test cases for _check_paths_exist()."""
+
+    @pytest.mark.parametrize('concurrent', [False, True], ids=['serial', 'concurrent'])
+    @pytest.mark.parametrize('stat_dir_fd', [True, False], ids=['dir_fd', 'full_path'])
+    @pytest.mark.parametrize('build_paths_dict, checked_keys, missing_key', CHECK_PATHS_CASES)
+    def test_check_paths_exist(self, shared_dirs, monkeypatch, stat_dir_fd, concurrent, build_paths_dict,
+                               checked_keys, missing_key):
+        """Test which paths are checked and which missing path is reported first, with all lookup methods."""
+        monkeypatch.setattr(config_module, '_STAT_DIR_FD', stat_dir_fd and config_module._STAT_DIR_FD)
+        paths_dict = build_paths_dict(shared_dirs)
+        if missing_key is None:
+            assert sorted(_check_paths_exist(paths_dict, concurrent)) == checked_keys
+        else:
+            with pytest.raises(FileNotFoundError, match=MISSING_PATH_RE) as excinfo:
+                _check_paths_exist(paths_dict, concurrent)
+            assert _missing_key(excinfo) == missing_key
+
+    @pytest.mark.parametrize('stat_dir_fd', [True, False], ids=['dir_fd', 'full_path'])
+    def test_other_errors_are_not_reported_missing(self, tmp_path, monkeypatch, stat_dir_fd):
+        """Test that errors other than a missing path, here a symlink loop, are raised unchanged."""
+        monkeypatch.setattr(config_module, '_STAT_DIR_FD', stat_dir_fd and config_module._STAT_DIR_FD)
+        os.symlink('loop', tmp_path / 'loop')
+        (tmp_path / 'valid').mkdir()
+        with pytest.raises(OSError) as excinfo:
+            _check_paths_exist({'loop': os.fspath(tmp_path / 'loop'), 'valid': os.fspath(tmp_path / 'valid')})
+        assert excinfo.value.errno == errno.ELOOP
+
+    @pytest.mark.parametrize('gcm_store, concurrent', [('lustre', True), ('argo', False)])
+    def test_only_remote_stores_are_checked_concurrently(self, monkeypatch, gcm_store, concurrent):
+        """Test that the thread pool is only used for the paths of stores on network file systems."""
+        calls = []
+        monkeypatch.setattr(config_module, '_check_paths_exist', lambda paths, concurrent: calls.append(concurrent))
+        monkeypatch.setenv('GCM_STORE', gcm_store)
+        load_config_dict(CONFIG_DICT, check_paths=True)
+        assert calls == [concurrent]
+
+    def test_returns_stat_results(self, shared_dirs):
+        """Test that the os.stat() results of the checked paths are returned."""
+        stats = _check_paths_exist({'file': os.fspath(shared_dirs.file), 'valid': os.fspath(shared_dirs.valid)})
+        assert stats['file'].st_size == len('test content')
+        assert stats['valid'].st_ino == os.stat(shared_dirs.valid).st_ino
+
+    @pytest.mark.skipif(os.environ.get('RUN_PERF') != '1', reason='performance gate, set RUN_PERF=1 to run')
+    def test_performance(self, shared_dirs):
+        """Test that checking a typical path block costs at most a small multiple of stat-ing its paths."""
+        paths_dict = {'home': os.fspath(shared_dirs.home), 'path_gcm_base': os.fspath(shared_dirs.gcm_base),
+                      'dir_forecast': os.fspath(shared_dirs.forecast), 'mask_dir': os.fspath(shared_dirs.masks),
+                      'filename_telcon': 'oni2enso.nc'}
+        checked = [path for key, path in paths_dict.items() if 'filename' not in key]
+
+        def best_of_three(check):
+            timings = []
+            for _ in range(3):
+                start = time.perf_counter()
+                for _ in range(10_000):
+                    check()
+                timings.append(time.perf_counter() - start)
+            return min(timings)
+
+        baseline = best_of_three(lambda: [os.stat(path) for path in checked])
+        assert best_of_three(lambda: _check_paths_exist(paths_dict)) < PERF_BUDGET_FACTOR * baseline
+
+
+class TestLoadConfig:
+    """Test cases for load_config()."""
+
+    @pytest.mark.parametrize('gcm_store, extra_paths, expected_store', [
+        pytest.param(None, {}, 'lustre', id='default_gcm_store'),
+        pytest.param('argo', {}, 'argo', id='custom_gcm_store'),
+        pytest.param('lustre', {'filename_telcon': 'oni2enso.nc'}, 'lustre', id='filename_keys_kept'),
+        pytest.param('lustre', {'rundir': '/path with spaces/run'}, 'lustre', id='path_with_spaces'),
+        pytest.param('argo', {'rundir': "/dätä/it's #1 & more: yes"}, 'argo', id='special_characters'),
+    ])
+    def test_store_selection(self, monkeypatch, gcm_store, extra_paths, expected_store):
+        """Test that GCM_STORE selects its path block as written and keeps the other fields."""
+        if gcm_store is None:
+            monkeypatch.delenv('GCM_STORE', raising=False)
+        else:
+            monkeypatch.setenv('GCM_STORE', gcm_store)
+        config_dict = copy.deepcopy(CONFIG_DICT)
+        config_dict['paths'][expected_store].update(extra_paths)
+        config = load_config_dict(config_dict)
+        assert config['paths'] == config_dict['paths'][expected_store]
+        assert config['models'] == ['ecmwf']
+        assert config['domain'] == 'Iberia'
+
+    def test_unknown_store_raises_error(self, monkeypatch):
+        """Test that an unknown GCM_STORE raises a ValueError."""
+        monkeypatch.setenv('GCM_STORE', 'unknown')
+        with pytest.raises(ValueError, match=UNKNOWN_STORE_RE):
+            load_config_dict(CONFIG_DICT)
+
+    def test_non_ascii_content(self):
+        """Test that UTF-8 encoded values are decoded correctly."""
+        content = CONFIG_CONTENT.replace("'Iberia'", "'Península Ibérica'").encode('utf-8')
+        assert load_config(io.BytesIO(content))['domain'] == 'Península Ibérica'
+
+    def test_check_paths(self, monkeypatch):
+        """Test that missing paths are only reported when requested."""
+        monkeypatch.setenv('GCM_STORE', 'lustre')
+        load_config_dict(CONFIG_DICT)
+        with pytest.raises(FileNotFoundError, match=MISSING_PATH_RE):
+            load_config_dict(CONFIG_DICT, check_paths=True)
+
+    def test_file_not_found(self, tmp_path):
+        """Test that a missing configuration file raises FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            load_config(tmp_path / 'missing.yaml')
+
+    def test_stream_matches_file(self, base_config_file):
+        """Test that loading from a stream gives the same result as loading the file."""
+        with open(base_config_file, 'rb') as stream:
+            assert load_config(stream) == load_config(base_config_file)
+
+    def test_dict_matches_file(self, base_config_file, monkeypatch):
+        """Test that loading the parsed dictionary gives the same result as loading the file."""
+        monkeypatch.setenv('GCM_STORE', 'argo')
+        assert load_config_dict(CONFIG_DICT) == load_config(base_config_file)
+        assert load_config_dict(CONFIG_DICT, build_argo_paths=True) == load_config_argo(base_config_file)
+        assert CONFIG_DICT == yaml.safe_load(CONFIG_CONTENT)
+
+    @pytest.mark.skipif(not yaml.__with_libyaml__, reason='PyYAML built without libyaml')
+    def test_uses_c_loader_when_available(self):
+        """Test that the libyaml-backed loader is used when PyYAML provides it."""
+        assert config_module.SafeLoader is yaml.CSafeLoader
+
+    def test_logs_config_path(self, base_config_file, caplog):
+        """Test that the path of the configuration file is logged at DEBUG level."""
+        with caplog.at_level(logging.DEBUG, logger='pyseasonal.utils.config'):
+            load_config(base_config_file)
+        assert 'The path of the configuration file is ' + os.fspath(base_config_file) in caplog.text
+
+    def test_no_stdout_output(self, base_config_file, capsys):
+        """Test that loading a configuration writes nothing to stdout."""
+        load_config(base_config_file)
+        assert capsys.readouterr().out == ''
+
+
+class TestLoadConfigArgo:
+    """Test cases for load_config_argo()."""
+
+    def test_data_dir_prefix(self, monkeypatch):
+        """Test that the argo paths are prefixed with DATA_DIR."""
+        monkeypatch.setenv('GCM_STORE', 'argo')
+        monkeypatch.setenv('DATA_DIR', '/data/')
+        paths = load_config_dict(CONFIG_DICT, build_argo_paths=True)['paths']
+        assert paths['home'] == '/data/'
+        assert paths['path_gcm_base'] == '/data/seasonal-original-single-levels'
+        assert paths['dir_forecast'] == '/data/seasonal-original-single-levels_derived/forecast'
+        assert paths['mask_dir'] == '/Auxiliary-material/Masks'
+
+    def test_other_stores_unchanged(self, monkeypatch):
+        """Test that stores other than argo are returned as written."""
+        monkeypatch.setenv('GCM_STORE', 'lustre')
+        monkeypatch.setenv('DATA_DIR', '/data/')
+        argo_paths = load_config_dict(CONFIG_DICT, build_argo_paths=True)['paths']
+        assert argo_paths == load_config_dict(CONFIG_DICT)['paths']
+
+
+@pytest.mark.slow
+class TestLoadConfigIntegration:
+    """Integration tests loading realistic configurations with path checks."""
+
+    def test_load_realistic_config_structure(self, shared_dirs, yaml_file, monkeypatch):
+        """Test loading a pred2tercile-like configuration whose paths all exist."""
+        dirs = {name: os.fspath(path) for name, path in vars(shared_dirs).items()}
+        config_dict = copy.deepcopy(REALISTIC_CONFIG)
+        config_dict['paths']['lustre'] = {key: dirs[name] for key, name in REALISTIC_PATH_DIRS.items()}
+        config_file = yaml_file(yaml.safe_dump(config_dict))
+        monkeypatch.setenv('GCM_STORE', 'lustre')
+        config = load_config(config_file, check_paths=True)
+        assert config['models'] == ['ecmwf', 'cmcc']
+        assert config['quantile_threshold'] == [0.33, 0.67]
+        assert config['paths'] == config_dict['paths']['lustre']
+
+    def test_argo_paths_checked_below_data_dir(self, shared_dirs, yaml_file, monkeypatch):
+        """Test that the argo paths are checked after prefixing them with DATA_DIR."""
+        config_file = yaml_file(ARGO_TEMPLATE.substitute(masks=shared_dirs.masks))
+        monkeypatch.setenv('GCM_STORE', 'argo')
+        dirs = {name: os.fspath(path) for name, path in vars(shared_dirs).items()}
+        monkeypatch.setenv('DATA_DIR', dirs['root'])
+        paths = load_config_argo(config_file, check_paths=True)['paths']
+        assert paths['path_gcm_base'] == dirs['gcm_base']
+        assert paths['dir_forecast'] == dirs['forecast']
+
+
+EDGE_DIR_NAMES = {'valid': 'valid', 'spaces': 'test data with spaces', 'test_data': 'test_data',
+                  'relative': 'relative_dir'}
+
+
+@pytest.fixture(scope='class')
+def edge_dirs(tmp_path_factory):
+    """Directories shared by the edge case tests, created once per class."""
+    root = tmp_path_factory.mktemp('edge_dirs')
+    for name in EDGE_DIR_NAMES.values():
+        (root / name).mkdir()
+    return dict({key: root / name for key, name in EDGE_DIR_NAMES.items()}, root=root)
+
+
+class TestEdgeCases:
+    """Edge cases of path values in otherwise valid configurations."""
+
+    @staticmethod
+    def _load(paths, monkeypatch):
+        """Load a configuration with the given lustre path block, checking the paths."""
+        monkeypatch.setenv('GCM_STORE', 'lustre')
+        return load_config_dict({'models': ['ecmwf'], 'paths': {'lustre': paths}}, check_paths=True)
+
+    def test_path_with_spaces(self, edge_dirs, monkeypatch):
+        """Test that paths containing spaces are kept and checked."""
+        spaces = os.fspath(edge_dirs['spaces'])
+        config = self._load({'home': spaces}, monkeypatch)
+        assert config['paths']['home'] == spaces
+
+    def test_special_characters_in_values(self, edge_dirs, monkeypatch):
+        """Test that file names with special characters are passed through unchecked."""
+        config = self._load({'home': os.fspath(edge_dirs['test_data']),
+                             'filename_telcon': 'oni_#1 (v2) & co.nc'}, monkeypatch)
+        assert config['paths']['filename_telcon'] == 'oni_#1 (v2) & co.nc'
+
+    def test_mixed_valid_and_invalid_paths(self, edge_dirs, monkeypatch):
+        """Test that a missing path is reported among existing ones."""
+        with pytest.raises(FileNotFoundError, match=MISSING_PATH_RE) as excinfo:
+            self._load({'home': os.fspath(edge_dirs['valid']), 'missing': os.fspath(edge_dirs['root'] / 'missing'),
+                        'rundir': os.fspath(edge_dirs['test_data'])}, monkeypatch)
+        assert _missing_key(excinfo) == 'missing'
+
+    def test_only_skipped_paths(self, monkeypatch):
+        """Test that a path block holding only skipped entries loads without checks."""
+        config = self._load({'home': '', 'filename_telcon': 'oni2enso.nc'}, monkeypatch)
+        assert config['paths'] == {'home': '', 'filename_telcon': 'oni2enso.nc'}
+
+    def test_relative_paths(self, edge_dirs, monkeypatch):
+        """Test that relative paths are checked against the working directory."""
+        monkeypatch.chdir(edge_dirs['root'])
+        config = self._load({'home': 'relative_dir', 'rundir': './valid'}, monkeypatch)
+        assert config['paths']['home'] == 'relative_dir'
+        with pytest.raises(FileNotFoundError, match=MISSING_PATH_RE) as excinfo:
+            self._load({'home': 'no_such_dir'}, monkeypatch)
+        assert _missing_key(excinfo) == 'home'
+
+
+class TestResolveConfig:
+    """Test cases for resolve_config()."""
+
+    def test_resolved_config_is_loaded_as_is(self, base_config_file, tmp_path, monkeypatch):
+        """Test that resolved paths are not prefixed again when loading."""
+        resolved_file = tmp_path / 'resolved.yaml'
+        resolve_config(base_config_file, resolved_file, data_dir='/data')
+        monkeypatch.setenv('GCM_STORE', 'argo')
+        monkeypatch.setenv('DATA_DIR', '/other')
+        config = load_config_argo(resolved_file)
+        assert config['paths']['home'] == '/data'
+        assert config['paths']['path_gcm_base'] == '/data/seasonal-original-single-levels'
+        assert config['models'] == ['ecmwf']
+        assert config['_is_resolved'] is True
+
+    def test_matches_runtime_resolution(self, base_config_file, tmp_path, monkeypatch):
+        """Test that resolving ahead of time gives the same paths as loading the source file."""
+        monkeypatch.setenv('GCM_STORE', 'argo')
+        monkeypatch.setenv('DATA_DIR', '/data/')
+        resolved_file = tmp_path / 'resolved.yaml'
+        resolve_config(base_config_file, resolved_file)
+        assert load_config_argo(resolved_file)['paths'] == load_config_argo(base_config_file)['paths']
+
+    def test_unknown_store_raises_error(self, base_config_file, tmp_path):
+        """Test that resolving an unknown store raises a ValueError."""
+        with pytest.raises(ValueError, match=UNKNOWN_STORE_RE):
+            resolve_config(base_config_file, tmp_path / 'resolved.yaml', gcm_store='unknown')
+        assert os.listdir(tmp_path) == []
+
+    def test_non_ascii_resolved_config_is_utf8(self, tmp_path, monkeypatch):
+        """Test that the resolved file is UTF-8 encoded also under an ASCII locale."""
+        config_file, resolved_file = tmp_path / 'config.yaml', tmp_path / 'resolved.yaml'
+        _write_config(config_file, CONFIG_CONTENT.replace("'Iberia'", "'Península Ibérica'"))
+        monkeypatch.setenv('DATA_DIR', '/data')
+        _run_with_ascii_locale('resolve_config', config_file, resolved_file)
+        monkeypatch.setenv('GCM_STORE', 'argo')
+        assert load_config_argo(resolved_file)['domain'] == 'Península Ibérica'
+
+    def test_missing_data_dir_raises_error(self, base_config_file, tmp_path, monkeypatch):
+        """Test that argo paths without any base directory are not written as resolved."""
+        monkeypatch.delenv('DATA_DIR', raising=False)
+        with pytest.raises(ValueError, match='No base directory for the <argo> paths'):
+            resolve_config(base_config_file, tmp_path / 'resolved.yaml')
+        assert os.listdir(tmp_path) == []
+
+    def test_resolved_config_mode_follows_umask(self, base_config_file, tmp_path):
+        """Test that the resolved file is created with the mode of a plain open(), readable by other users."""
+        umask = os.umask(0o022)
+        try:
+            resolve_config(base_config_file, tmp_path / 'resolved.yaml', data_dir='/data')
+        finally:
+            os.umask(umask)
+        assert stat.S_IMODE(os.stat(tmp_path / 'resolved.yaml').st_mode) == 0o644
+
+
+class TestJsonSibling:
+    """Test cases for yaml2json() and the loading of JSON siblings."""
+
+    def test_json_sibling_matches_yaml(self, config_file, monkeypatch):
+        """Test that the converted file yields the same configuration."""
+        monkeypatch.setenv('GCM_STORE', 'argo')
+        expected = load_config_argo(config_file)
+        json_file = yaml2json(config_file)
+        assert json_file == os.fspath(config_file.with_suffix('.json'))
+        assert load_config_argo(config_file) == expected
+
+    def test_up_to_date_json_sibling_is_used(self, config_file):
+        """Test that a JSON sibling newer than the YAML file is read instead."""
+        json_file = Path(yaml2json(config_file))
+        _write_config(json_file, json_file.read_text().replace('Iberia', 'medcof'))
+        stat = os.stat(config_file)
+        os.utime(json_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert load_config(config_file)['domain'] == 'medcof'
+
+    def test_stale_json_sibling_is_ignored(self, config_file):
+        """Test that a JSON sibling older than the YAML file is not used."""
+        json_file = Path(yaml2json(config_file))
+        _write_config(json_file, json_file.read_text().replace('Iberia', 'medcof'))
+        stat = os.stat(config_file)
+        os.utime(json_file, ns=(stat.st_atime_ns, stat.st_mtime_ns - 1_000_000_000))
+        assert load_config(config_file)['domain'] == 'Iberia'
+
+    def test_json_sibling_mode_follows_umask(self, config_file):
+        """Test that the JSON sibling is created with the mode of a plain open(), readable by other users."""
+        umask = os.umask(0o022)
+        try:
+            json_file = Path(yaml2json(config_file))
+        finally:
+            os.umask(umask)
+        assert stat.S_IMODE(os.stat(json_file).st_mode) == 0o644
+
+    def test_json_sibling_with_same_mtime_is_ignored(self, config_file):
+        """Test that the YAML file is read when its JSON sibling has the same modification time."""
+        json_file = Path(yaml2json(config_file))
+        _write_config(json_file, json_file.read_text().replace('Iberia', 'medcof'))
+        stat = os.stat(config_file)
+        os.utime(json_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert load_config(config_file)['domain'] == 'Iberia'
+
+    @pytest.mark.parametrize('extra', ['start: 2024-01-01\n', 'years: {1993: a}\n'], ids=['date', 'integer_key'])
+    def test_unconvertible_config_leaves_no_sibling(self, config_file, extra):
+        """Test that configurations JSON cannot represent raise ValueError without writing a sibling."""
+        _write_config(config_file, CONFIG_CONTENT + extra)
+        with pytest.raises(ValueError):
+            yaml2json(config_file)
+        assert os.listdir(config_file.parent) == [config_file.name]
+        assert load_config(config_file)['domain'] == 'Iberia'
+
+    def test_non_ascii_sibling_is_utf8(self, config_file):
+        """Test that the JSON sibling is UTF-8 encoded also under an ASCII locale."""
+        _write_config(config_file, CONFIG_CONTENT.replace("'Iberia'", "'Península Ibérica'"))
+        _run_with_ascii_locale('yaml2json', config_file)
+        assert load_config(config_file)['domain'] == 'Península Ibérica'
+        assert json.loads(config_file.with_suffix('.json').read_bytes())['domain'] == 'Península Ibérica'
+
+
+class TestValidateConfig:
+    """Test cases for the structural validation of configuration files."""
+
+    @pytest.mark.parametrize('config_path', sorted((Path(__file__).parent.parent / 'config').glob('*.yaml')),
+                             ids=lambda path: path.name)
+    def test_shipped_configs_are_valid(self, config_path):
+        """Test that all configuration files shipped with the package pass validation."""
+        config_module._parse_config(config_path.read_bytes())
+
+    @pytest.mark.parametrize('content', ['', '- a\n- b\n', 'models: [ecmwf]\n', 'paths: /lustre\n',
+                                         'paths:\n  lustre:\n    home: [a, b]\n'])
+    def test_malformed_config_raises_error(self, content):
+        """Test that configuration files without a valid <paths> mapping are rejected."""
+        with pytest.raises(ValueError):
+            load_config(io.StringIO(content))
+
+    def test_invalid_yaml_syntax(self):
+        """Test that YAML syntax errors are raised as yaml.YAMLError, not as validation errors."""
+        with pytest.raises(yaml.YAMLError):
+            load_config(io.StringIO('this is not: valid: yaml: content:'))
+
+    def test_incomplete_argo_paths_raise_error(self):
+        """Test that an argo block lacking a DATA_DIR relative path is rejected."""
+        content = CONFIG_CONTENT.replace("    dir_forecast: 'seasonal", "    dir_fc: 'seasonal")
+        with pytest.raises(ValueError, match='lacks dir_forecast'):
+            load_config(io.StringIO(content))
+
+
+class TestConfigCache:
+    """Test cases for the caching of parsed configuration files."""
+
+    def test_repeated_loads_parse_once(self, base_config_file):
+        """Test that an unchanged file is parsed only once."""
+        config_module._load_config_cached.cache_clear()
+        load_config(base_config_file)
+        load_config(base_config_file)
+        info = config_module._load_config_cached.cache_info()
+        assert info.misses == 1
+        assert info.hits == 1
+
+    def test_identical_files_parse_once(self, tmp_path):
+        """Test that files with identical content share one parse."""
+        config_module._parse_config.cache_clear()
+        for name in ['a.yaml', 'b.yaml']:
+            _write_config(tmp_path / name, CONFIG_CONTENT)
+            load_config(tmp_path / name)
+        info = config_module._parse_config.cache_info()
+        assert info.misses == 1
+        assert info.hits == 1
+
+    def test_returned_config_is_a_copy(self, base_config_file, monkeypatch):
+        """Test that modifying a loaded configuration does not affect later loads."""
+        monkeypatch.setenv('GCM_STORE', 'argo')
+        monkeypatch.setenv('DATA_DIR', '/data/')
+        first = load_config_argo(base_config_file)
+        first['models'].append('cmcc')
+        second = load_config_argo(base_config_file)
+        assert second['models'] == ['ecmwf']
+        assert second['paths']['path_gcm_base'] == '/data/seasonal-original-single-levels'
+
+    def test_changed_file_is_reloaded(self, config_file):
+        """Test that a modified file is parsed again."""
+        load_config(config_file)
+        _write_config(config_file, CONFIG_CONTENT.replace("domain: 'Iberia'", "domain: 'medcof'"))
+        stat = os.stat(config_file)
+        os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert load_config(config_file)['domain'] == 'medcof'